@@ -2,9 +2,13 @@
 # Versión mejorada y corregida del Analizador de Sentimientos en español (solo reglas)
 # Recomendación: ejecutar con Python 3.8+
 import re
+import heapq
 import logging
+from bisect import bisect_left
 from collections import Counter
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Union
+from lexico import cargar_lexico, PACK_POR_DEFECTO
 
 # ---------- CONFIGURACIÓN ----------
 DEFAULT_DEBUG = False
@@ -43,145 +47,47 @@ class AnalizadorSentimientos:
     Mejoras: manejo de fuertes, mejor sarcasmo, aspectos con límites de palabra.
     """
 
-    def __init__(self, debug: bool = DEFAULT_DEBUG):
+    def __init__(self, debug: bool = DEFAULT_DEBUG, pack: str = None):
         self.debug = debug
         if debug:
             logging.basicConfig(level=logging.DEBUG)
 
-        # Diccionarios / léxicos
-        self.p_positivas = {
-            'excelente','increible','increíble','genial','perfecto','perfecta','perfectos','perfectas',
-            'maravilloso','maravillosa','fantastico','fantástico','fantastica','fenomenal','magico','magnifico',
-            'sorprendente','satisfecho','satisfecha','encanta','encantó','recomiendo','recomendado',
-            'vale','pena','util','útil','practico','práctico','bueno','buena','buenisimo','buenísimo',
-            'amable','rapido','rápido','eficiente','gracias','feliz','contento','contenta','mejor','sobresaliente',
-            'impecable','premium','exitoso','estupendo',
-            'magnífica','magnífica','fantabuloso','increíblemente','óptimo','óptima','maravillosamente',
-            'excelentemente','grandioso','grandiosa','placentero','placentera','positivo','positiva',
-            'útilísimo','útilisima','formidable','excelentísimo','excelentisimo','comodísimo','comodisimo',
-            'inmejorable','brillante','top','hermoso','hermosa','valioso','valiosa','increíblemente bueno',
-            'agradable','agradablemente','perfectísimo','perfectisimo','eficaz','efectivo','efectiva',
-            'superior','notable','respetuoso','respetuosa','profesional','detallado','detallada',
-            'rápidamente','amablemente','gentil','atento','atenta','servicial','responsable','puntual',
-            'topísimo','topisimo','maravillosamente bien','excelente atención','excelente servicio',
-            'bien hecho','recomendadísimo','útil y práctico','estético','bonito','bonita',
-            'encantador','encantadora','excepcional','extraordinario','extraordinaria'
-            }
-        # Palabras positivas FUERTES (peso mayor por sí solas)
-        self.p_positivas_fuertes = {
-            'excelente', 'increible', 'increíble', 'maravilloso', 'fenomenal',
-            'impecable', 'sobresaliente', 'buenisimo', 'buenísimo', 'magnífico',
-            'magnifico', 'espectacular', 'perfecto', 'perfecta', 'fantástico',
-            'fantastico', 'extraordinario', 'extraordinaria', 'sensacional',
-            'impresionante', 'formidable', 'inmejorable', 'brillante',
-            'genial', 'excepcional', 'increíblemente bueno', 'maravillosamente bien'
-            }
-
-        self.p_negativas = {
-            'malo','mala','peor','peores','pésimo','pésima','horrible','terrible','decepcion','decepcionante',
-            'defectuoso','defectuosa','defecto','defectos','dañado','dañada','roto','rota','falla','fallas',
-            'inutil','inútil','inservible','estafa','fraude','engaño','engañó','engañar','cobro','lento','lenta',
-            'caro','cara','basura','asco','trabas','traba','crash','crasheo','crashé','error','errores','frustrante',
-            'no sirve','no funciona','no me gustó','no me gusto','jamás','nunca','pésimo servicio','miserable',
-            # Problemas de funcionamiento
-            'no sirve','no funciona','no me gustó','no me gusto','no prende','no carga','no enciende',
-            'se apaga','se traba','se congela','se descompone','se descompuso','se rompió','no responde',
-            # Negativo fuerte sobre servicio
-            'jamás','nunca','tarde','tardado','tardanza','pésimo servicio','mal servicio','descuidado',
-            'irresponsable','mala atención','poca atención','mal trato','grosero','grosera','ineficiente',
-            # Experiencia negativa
-            'miserable','horrendo','terrible experiencia','torpe','deplorable','patético','patetico',
-            'lamentable','deficiente','molesto','molesta','molestia','inaceptable','inadmisible',
-            'desastroso','desastre','crítico','critico','problemático','problematico',
-            # Temas de dinero
-            'costoso','sobreprecio','carísimo','carisimo','cobran de más','cobro indebido','estafadores',
-            'estafa total','robo','robado','robada','mal negocio',
-            # Problemas de entrega/envío
-            'no llegó','no llega','no entregaron','no entregan','tardó demasiado','dañado en el envío',
-            'paquete incompleto','producto incompleto','faltante','faltantes',
-            # Problemas de calidad
-            'mal acabado','mal hecho','mal fabricado','mal ensamblado','pobre calidad','baja calidad',
-            'cutre','barato y malo','quebradizo','fragil','frágil',
-            # Sensación negativa
-            'arrepentido','arrepentida','arrepentimiento','vergonzoso','desagradable','molesto','terrible producto'
-            }
-        
-        # Palabras negativas FUERTES
-        self.p_negativas_fuertes = {
-            'pésimo','pesimo','horrible','terrible','estafa','fraude','miserable', "peligroso", "estafadores", "mentiras"
-            'asqueroso', 'patetico', 'patético', 'nefasta', 'nefasto',
-            'basura', 'malísimo', 'malisimo', 'engañoso', 'engaño',
-            'inútil', 'inutil', 'desastroso', 'defectuoso', 'repugnante',
-            'abominable', 'lamentable', 'engañoso', 'corrupto',
-            'pérdida', 'perdida', 'timo', 'fraudulento', 'inservible',
-            'pésima', 'pesima', 'horroroso', 'deplorable', 'desagradable',
-            'peligrosísimo', 'peligrosisimo', 'arruinado', 'arruina',
-            'falso', 'falsificado', 'ilegal', 'riesgoso', 'maltrato',
-            'estafado', 'deficiente', 'descompuesto', 'estafadora',
-            'inadmisible', 'vergonzoso', 'fatal', 'inaceptable'
-            }
+        # Léxicos compilados desde lexicos/<pack>.json (ver lexico.py)
+        self.lexico = cargar_lexico(pack, plegar=self.limpiar_texto)
+        self.pack = pack or PACK_POR_DEFECTO
+        self.p_positivas = self.lexico['positivas']
+        self.p_positivas_fuertes = self.lexico['positivas_fuertes']
+        self.p_negativas = self.lexico['negativas']
+        self.p_negativas_fuertes = self.lexico['negativas_fuertes']
+        self.pesos_palabras = self.lexico['pesos_palabras']
 
         # Negaciones e intensificadores
-        self.negaciones = {'no','nunca','jamás','jamas','tampoco','sin','ni','nadie','ninguno','ninguna','nada'}
-        self.intensificadores = {'muy','mucho','muchisimo','muchísimo','bastante','totalmente','completamente','absolutamente','realmente','sumamente','demasiado','extremadamente','super','súper'}
-        self.atenuadores = {'poco','algo','medianamente','relativamente','ligeramente','apenas','casi','un poco'}
+        self.negaciones = self.lexico['negaciones']
+        self.intensificadores = self.lexico['intensificadores']
+        self.atenuadores = self.lexico['atenuadores']
+        self.palabras_neutras = self.lexico['neutras']
 
-        # Frases contextuales
-        self.frases_positivas = {
-            'lo recomiendo', 'vale la pena', 'calidad excepcional', 'supero las expectativas',
-            'superó expectativas', 'cumple con lo prometido', 'excelente calidad',
-            'volveré a comprar', 'totalmente recomendado', 'super recomendado', 'mejor compra',
-            'vale cada peso', 'de primera calidad', 'muy satisfecho', 'funciona perfectamente',
-            'encantado con el producto', 'superó lo esperado', 'compra recomendada',
-            'buena calidad', 'muy buena compra', 'me sorprendió para bien',
-            'excelente atención', 'justo lo que buscaba', 'funciona de maravilla',
-            'producto confiable', 'gran experiencia de compra', 'vale muchísimo la pena'
-            }
-        self.frases_negativas = {
-            'perdida de tiempo', 'no vale la pena', 'no lo recomiendo',
-            'no lo volveré a comprar', 'estafa total', 'decepcion total',
-            'no merece', 'muy mala calidad', 'no sirve para nada',
-            'no funciona bien', 'producto defectuoso', 'experiencia terrible',
-            'muy mala experiencia', 'malísima calidad', 'pésima calidad',
-            'mal servicio', 'engañado con el producto', 'publicidad engañosa',
-            'se descompuso rápido', 'no cumple lo prometido', 'nada recomendable',
-            'no es lo que esperaba', 'no vale lo que cuesta', 'me arrepiento de comprarlo',
-            'muy decepcionado', 'es una estafa', 'malísimo producto'
-        }
+        # Frases contextuales y bigrams (autómatas Aho-Corasick)
+        self.automata_frases = self.lexico['automata_frases']
+        self.automata_bigrams = self.lexico['automata_bigrams']
 
-        self.bigrams_positive = {
-            'muy bueno', 'muy bien', 'excelente servicio', 'muy util', 'muy útil',
-            'super recomendado', 'superó expectativas', 'muy satisfecho',
-            'altamente recomendado', 'muy contento', 'muy buena calidad',
-            'gran producto', 'muy funcional', 'perfecto estado', 'excelente atención'
-        }
-        
-        self.bigrams_negative = {
-            'muy malo', 'muy mal', 'no funciona', 'no sirve', 'pésimo servicio',
-            'nunca mas', 'nunca más', 'no lo recomiendo', 'muy decepcionado',
-            'pésima calidad', 'muy mala calidad', 'mala experiencia',
-            'muy defectuoso', 'no cumple', 'no recomendable', 'pésimo producto',
-            'no vale', 'muy lento', 'se traba', 'se descompone'
-        }
-
-        # Aspectos (clave -> palabras claves)
-        self.aspectos = {
-            'calidad': ['calidad', 'material', 'acabado', 'duradero', 'duradera', 'resistente'],
-            'precio': ['precio', 'caro', 'barato', 'coste', 'costo', 'economico', 'económico'],
-            'servicio': ['servicio', 'atención', 'atencion', 'entrega', 'envio', 'envío', 'soporte', 'devolución', 'devolucion'],
-            'funcionalidad': ['funciona', 'funcionar', 'uso', 'usar', 'util', 'útil', 'práctico']
-        }
+        # Aspectos (palabra clave plegada -> aspectos)
+        self.aspectos = self.lexico['aspectos']
+        self.indice_aspectos = self.lexico['indice_aspectos']
+        self.aspectos_compuestos = self.lexico['aspectos_compuestos']
 
         # Pesos y umbrales
-        self.PESO_FRASE = 2.5
-        self.PESO_BIGRAM = 1.5
-        self.PESO_PALABRA_MUY = 2.0
-        self.PESO_PALABRA = 1.0
-        self.PESO_NEG_MUY = -2.2
-        self.PESO_NEG = -1.0
+        pesos = self.lexico['pesos']
+        self.PESO_FRASE = pesos['frase']
+        self.PESO_BIGRAM = pesos['bigram']
+        self.PESO_PALABRA_MUY = pesos['palabra_fuerte']
+        self.PESO_PALABRA = pesos['palabra']
+        self.PESO_NEG_MUY = pesos['negativa_fuerte']
+        self.PESO_NEG = pesos['negativa']
 
     # ---------- Normalización ----------
-    def limpiar_texto(self, texto: str) -> str:
+    @staticmethod
+    def limpiar_texto(texto: str) -> str:
         if not texto:
             return ''
         texto = re.sub(r'http\S+|www\.\S+', '', texto)
@@ -261,80 +167,53 @@ class AnalizadorSentimientos:
         palabras_analizadas = 0
 
         # Frases contextuales
-        for frase in self.frases_positivas:
-            if frase in texto:
-                score += self.PESO_FRASE
-                cuenta_pos += abs(self.PESO_FRASE)
-                palabras_analizadas += 1
-                if self.debug:
-                    logging.debug(f"Frase positiva detectada: {frase} -> +{self.PESO_FRASE}")
-        for frase in self.frases_negativas:
-            if frase in texto:
-                score -= self.PESO_FRASE
-                cuenta_neg += abs(self.PESO_FRASE)
-                palabras_analizadas += 1
-                if self.debug:
-                    logging.debug(f"Frase negativa detectada: {frase} -> -{self.PESO_FRASE}")
+        frases_encontradas = self.automata_frases.buscar(texto)
+        for idx in frases_encontradas:
+            peso = self.automata_frases.pesos[idx]
+            score += peso
+            if peso > 0:
+                cuenta_pos += abs(peso)
+            else:
+                cuenta_neg += abs(peso)
+            palabras_analizadas += 1
+            if self.debug:
+                logging.debug(f"Frase detectada: {self.automata_frases.patrones[idx]} -> {peso:+}")
 
         # Bigrams
         texto_compacto = ' '.join(tokens_simple)
-        for big in self.bigrams_positive:
-            if big in texto_compacto:
-                score += self.PESO_BIGRAM
-                cuenta_pos += abs(self.PESO_BIGRAM)
-                palabras_analizadas += 1
-                if self.debug:
-                    logging.debug(f"Bigram positivo: {big} -> +{self.PESO_BIGRAM}")
-        for big in self.bigrams_negative:
-            if big in texto_compacto:
-                score -= self.PESO_BIGRAM
-                cuenta_neg += abs(self.PESO_BIGRAM)
-                palabras_analizadas += 1
-                if self.debug:
-                    logging.debug(f"Bigram negativo: {big} -> -{self.PESO_BIGRAM}")
+        for idx in self.automata_bigrams.buscar(texto_compacto):
+            peso = self.automata_bigrams.pesos[idx]
+            score += peso
+            if peso > 0:
+                cuenta_pos += abs(peso)
+            else:
+                cuenta_neg += abs(peso)
+            palabras_analizadas += 1
+            if self.debug:
+                logging.debug(f"Bigram detectado: {self.automata_bigrams.patrones[idx]} -> {peso:+}")
 
         # Palabras individuales con contexto
         for i, token in enumerate(tokens_simple):
             if token == '':
                 continue
             palabra = token.lower()
-            es_pos = palabra in self.p_positivas
-            es_neg = palabra in self.p_negativas
+            peso_base = self.pesos_palabras.get(palabra)
 
-            if es_pos or es_neg:
+            if peso_base is not None:
                 palabras_analizadas += 1
                 mod = self.calcular_modificador(tokens_simple, i)
                 invertir = self.ventana_negacion(tokens_simple, i, ventana=3)
 
-                if es_pos:
-                    peso_base = self.PESO_PALABRA_MUY if palabra in self.p_positivas_fuertes else self.PESO_PALABRA
-                    if invertir:
-                        peso = -peso_base * mod
-                        cuenta_neg += abs(peso)
-                        score += peso
-                        if self.debug:
-                            logging.debug(f"Palabra positiva '{palabra}' invertida por negación -> {peso}")
-                    else:
-                        peso = peso_base * mod
-                        cuenta_pos += abs(peso)
-                        score += peso
-                        if self.debug:
-                            logging.debug(f"Palabra positiva '{palabra}' -> +{peso}")
+                # invertir efecto de la palabra (positiva -> negativa y viceversa)
+                peso = -peso_base * mod if invertir else peso_base * mod
+                if peso > 0:
+                    cuenta_pos += abs(peso)
                 else:
-                    peso_base = self.PESO_NEG_MUY if palabra in self.p_negativas_fuertes else self.PESO_NEG
-                    if invertir:
-                        # invertir efecto de palabra negativa
-                        peso = -peso_base * mod  # peso_base es negativo -> -peso_base es positivo
-                        cuenta_pos += abs(peso)
-                        score += peso
-                        if self.debug:
-                            logging.debug(f"Palabra negativa '{palabra}' invertida por negación -> +{peso}")
-                    else:
-                        peso = peso_base * mod
-                        cuenta_neg += abs(peso)
-                        score += peso
-                        if self.debug:
-                            logging.debug(f"Palabra negativa '{palabra}' -> {peso}")
+                    cuenta_neg += abs(peso)
+                score += peso
+                if self.debug:
+                    estado = " invertida por negación" if invertir else ""
+                    logging.debug(f"Palabra '{palabra}'{estado} -> {peso:+}")
 
         # Emojis y signos
         emojis_positivos = re.findall(r'[😊😃😄😁🤗❤️💖👍⭐🌟✨🎉😍🥰😘]', texto_orig)
@@ -351,14 +230,16 @@ class AnalizadorSentimientos:
             if self.debug:
                 logging.debug(f"Exclamaciones: {exclam_count}, multiplicador {multiplier}, score ahora {score}")
 
-        # Aspectos encontrados (usando límites por palabra para reducir falsos positivos)
-        aspectos_encontrados = {}
-        for aspecto, claves in self.aspectos.items():
-            for k in claves:
-                # buscar palabra con límites \b para no coger substrings irrelevantes
-                if re.search(r'\b' + re.escape(k) + r'\b', texto):
-                    aspectos_encontrados.setdefault(aspecto, 0)
-                    aspectos_encontrados[aspecto] += 1
+        # Aspectos encontrados (por token completo para reducir falsos positivos)
+        conteo_aspectos = Counter()
+        tokens_unicos = set(tokens_simple)
+        for clave in tokens_unicos & self.indice_aspectos.keys():
+            conteo_aspectos.update(self.indice_aspectos[clave])
+        for clave, aspecto in self.aspectos_compuestos:
+            if f' {clave} ' in f' {texto_compacto} ':
+                conteo_aspectos[aspecto] += 1
+        # mismo orden que en el léxico (la intersección de conjuntos no tiene orden estable)
+        aspectos_encontrados = {a: conteo_aspectos[a] for a in self.aspectos if a in conteo_aspectos}
 
         # Sarcasmo
         sarcasmo = self.detectar_sarcasmo_simple(texto_orig)
@@ -379,7 +260,7 @@ class AnalizadorSentimientos:
             # ajustar por palabras analizadas (máx +20)
             confianza += min(max((palabras_analizadas - 1) * 5.0, 0.0), 20.0)
             # frases fuertes aumentan confianza un poco
-            if any(f in texto for f in (self.frases_positivas | self.frases_negativas)):
+            if frases_encontradas:
                 confianza = min(confianza + 8.0, 100.0)
         else:
             confianza = 35.0
@@ -408,8 +289,7 @@ class AnalizadorSentimientos:
             emoji = '😊' if score_scaled > 0 else '😞'
 
         # Afinar: palabras neutras
-        palabras_neutras = {'normal','regular','ok','aceptable','promedio','cumple','justo','usual'}
-        if any(re.search(r'\b' + re.escape(p) + r'\b', texto) for p in palabras_neutras) and abs(score_scaled) < 1.0:
+        if not tokens_unicos.isdisjoint(self.palabras_neutras) and abs(score_scaled) < 1.0:
             sentimiento = 'Neutro'
             emoji = '😐'
             confianza = max(confianza, 50.0)
@@ -466,16 +346,156 @@ def generar_reporte(resultados: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
     return reporte
 
-def obtener_top_comentarios(resultados: List[Dict[str, Any]], tipo: str = 'positivos', cantidad: int = 5) -> List[Dict[str, Any]]:
-    if tipo == 'positivos':
-        filtrados = [r for r in resultados if r['sentimiento'] == 'Positivo']
-        orden = sorted(filtrados, key=lambda x: x['score'], reverse=True)
-    elif tipo == 'negativos':
-        filtrados = [r for r in resultados if r['sentimiento'] == 'Negativo']
-        orden = sorted(filtrados, key=lambda x: x['score'])  # score negativo orden ascendente
-    else:
-        orden = []
-    return orden[:cantidad]
+def obtener_top_comentarios(resultados: Union[List[Dict[str, Any]], 'IndiceResultados'], tipo: str = 'positivos', cantidad: int = 5) -> List[Dict[str, Any]]:
+    sentimiento = {'positivos': 'Positivo', 'negativos': 'Negativo'}.get(tipo)
+    if sentimiento is None or cantidad <= 0:
+        return []
+    # Con un IndiceResultados ya construido no se filtra ni se reordena nada
+    if isinstance(resultados, IndiceResultados):
+        orden = resultados.orden_sentimiento.get(sentimiento, [])
+        return [resultados.resultados[i] for i in orden[:cantidad]]
+    filtrados = (r for r in resultados if r['sentimiento'] == sentimiento)
+    if sentimiento == 'Positivo':
+        return heapq.nlargest(cantidad, filtrados, key=lambda x: x['score'])
+    return heapq.nsmallest(cantidad, filtrados, key=lambda x: x['score'])  # score negativo orden ascendente
+
+# ---------- Índice de resultados ----------
+class IndiceResultados:
+    """
+    Índice en memoria sobre los resultados de un análisis, construido una sola vez.
+    - Por sentimiento: posiciones ordenadas por intensidad (Positivo: score desc,
+      Negativo: score asc, Neutro: |score| asc).
+    - Por confianza (global y por sentimiento): posiciones ordenadas por confianza,
+      de modo que el corte confianza_min es un bisect.
+    - Por aspecto y por sarcasmo: listas de posiciones (posting lists), globales y por
+      sentimiento; estas últimas ya en orden de intensidad.
+    Cada consulta elige entre recorrer la lista ordenada más corta hasta llenar la
+    página o filtrar la lista candidata más corta y ordenar solo lo que cabe en ella.
+    """
+
+    SENTIMIENTOS = ('Positivo', 'Negativo', 'Neutro')
+    MAX_POR_PAGINA = 200
+
+    def __init__(self, resultados: List[Dict[str, Any]]):
+        self.resultados = list(resultados)
+
+        claves_orden = {
+            'Positivo': lambda i: -self.resultados[i]['score'],
+            'Negativo': lambda i: self.resultados[i]['score'],
+            'Neutro': lambda i: abs(self.resultados[i]['score']),
+        }
+        por_sentimiento: Dict[str, List[int]] = {s: [] for s in self.SENTIMIENTOS}
+        self.aspectos: Dict[str, List[int]] = {}
+        self.sarcasticos: List[int] = []
+        self.no_sarcasticos: List[int] = []
+
+        for i, r in enumerate(self.resultados):
+            por_sentimiento.setdefault(r['sentimiento'], []).append(i)
+            for aspecto in r.get('aspectos') or {}:
+                self.aspectos.setdefault(aspecto, []).append(i)
+            (self.sarcasticos if r.get('sarcasmo') else self.no_sarcasticos).append(i)
+
+        # sorted es estable: en empates se conserva el orden original
+        self.orden_sentimiento = {
+            s: sorted(pos, key=claves_orden.get(s, claves_orden['Neutro']))
+            for s, pos in por_sentimiento.items()
+        }
+        # rango[i]: lugar de i dentro del orden de su sentimiento (clave de orden de salida).
+        # Además, listas ya en orden de salida por (sentimiento, aspecto) y (sentimiento, sarcasmo)
+        self.rango = [0] * len(self.resultados)
+        self.orden_aspecto: Dict[Tuple[str, str], List[int]] = {}
+        self.orden_sarcasmo: Dict[Tuple[str, bool], List[int]] = {}
+        for s, orden in self.orden_sentimiento.items():
+            for k, i in enumerate(orden):
+                r = self.resultados[i]
+                self.rango[i] = k
+                for aspecto in r.get('aspectos') or {}:
+                    self.orden_aspecto.setdefault((s, aspecto), []).append(i)
+                self.orden_sarcasmo.setdefault((s, bool(r.get('sarcasmo'))), []).append(i)
+
+        self.confianza_global = self._ordenar_por_confianza(range(len(self.resultados)))
+        self.confianza_sentimiento = {s: self._ordenar_por_confianza(pos) for s, pos in por_sentimiento.items()}
+
+    def _ordenar_por_confianza(self, posiciones) -> Tuple[List[int], List[float]]:
+        orden = sorted(posiciones, key=lambda i: self.resultados[i]['confianza'])
+        return orden, [self.resultados[i]['confianza'] for i in orden]
+
+    def __len__(self) -> int:
+        return len(self.resultados)
+
+    def _candidatas(self, sentimiento, aspecto, sarcasmo, confianza_min):
+        """Listas candidatas como (longitud, posiciones, ya_en_orden_de_salida)."""
+        candidatas = []
+        if sentimiento:
+            orden = self.orden_sentimiento.get(sentimiento, [])
+            candidatas.append((len(orden), orden, True))
+            if aspecto:
+                orden = self.orden_aspecto.get((sentimiento, aspecto), [])
+                candidatas.append((len(orden), orden, True))
+            if sarcasmo is not None:
+                orden = self.orden_sarcasmo.get((sentimiento, sarcasmo), [])
+                candidatas.append((len(orden), orden, True))
+        else:
+            candidatas.append((len(self.resultados), range(len(self.resultados)), True))
+            if aspecto:
+                posting = self.aspectos.get(aspecto, [])
+                candidatas.append((len(posting), posting, True))
+            if sarcasmo is not None:
+                posting = self.sarcasticos if sarcasmo else self.no_sarcasticos
+                candidatas.append((len(posting), posting, True))
+        if confianza_min is not None:
+            if sentimiento:
+                orden, claves = self.confianza_sentimiento.get(sentimiento, ([], []))
+            else:
+                orden, claves = self.confianza_global
+            inicio = bisect_left(claves, confianza_min)
+            # sin copiar la cola de la lista: solo se recorre si se elige
+            candidatas.append((len(orden) - inicio, (orden[k] for k in range(inicio, len(orden))), False))
+        return candidatas
+
+    def consultar(self, sentimiento: str = None, aspecto: str = None, sarcasmo: bool = None,
+                  confianza_min: float = None, pagina: int = 1, por_pagina: int = 20) -> Dict[str, Any]:
+        """
+        Devuelve {'resultados', 'pagina', 'por_pagina', 'hay_mas'} para los filtros dados.
+        Ej.: consultar('Negativo', aspecto='precio', confianza_min=60, por_pagina=20)
+        """
+        por_pagina = max(1, min(int(por_pagina), self.MAX_POR_PAGINA))
+        # Más allá de esta página no hay resultados: acotarla evita límites gigantes en islice
+        pagina = max(1, min(int(pagina), len(self.resultados) // por_pagina + 2))
+        sentimiento = (sentimiento or '').strip().capitalize() or None
+        aspecto = (aspecto or '').strip().lower() or None
+
+        def cumple(i: int) -> bool:
+            r = self.resultados[i]
+            return ((sentimiento is None or r['sentimiento'] == sentimiento)
+                    and (aspecto is None or aspecto in (r.get('aspectos') or {}))
+                    and (sarcasmo is None or bool(r.get('sarcasmo')) == sarcasmo)
+                    and (confianza_min is None or r['confianza'] >= confianza_min))
+
+        candidatas = self._candidatas(sentimiento, aspecto, sarcasmo, confianza_min)
+        limite = pagina * por_pagina + 1  # uno más para saber si hay página siguiente
+
+        # Dos planes: recorrer la lista ordenada más corta hasta llenar la página, o filtrar
+        # la lista candidata más corta (a lo sumo m coincidencias) y ordenar solo lo necesario.
+        # Suponiendo las coincidencias repartidas, recorrer cuesta unas limite * L / m filas.
+        m, corta, _ = min(candidatas, key=lambda c: c[0])
+        largo, ordenada, _ = min((c for c in candidatas if c[2]), key=lambda c: c[0])
+        coste_recorrer = largo if m == 0 else min(largo, limite * largo / m)
+
+        if coste_recorrer <= m:
+            # ya está en orden de salida: se deja de recorrer al llenar la página
+            seleccion = list(islice(filter(cumple, ordenada), limite))
+        else:
+            seleccion = heapq.nsmallest(limite, filter(cumple, corta),
+                                        key=self.rango.__getitem__ if sentimiento else None)
+
+        inicio = (pagina - 1) * por_pagina
+        return {
+            'resultados': [self.resultados[i] for i in seleccion[inicio:inicio + por_pagina]],
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'hay_mas': len(seleccion) > pagina * por_pagina
+        }
 
 # ---------- EJEMPLO / PRUEBAS ----------
 if __name__ == "__main__":
@@ -499,12 +519,13 @@ if __name__ == "__main__":
     ]
 
     resultados = procesar_comentarios_completos(pruebas, debug=True)
+    indice = IndiceResultados(resultados)
     for r in resultados:
         print(f"[{r['id']}] {r['emoji']} {r['sentimiento']:8s} | Score: {r['score']:>5} | Conf: {r['confianza']:>5}% | {r['comentario']}")
     print("\nREPORTE:")
     print(generar_reporte(resultados))
     print("\nTOP negativos:")
-    print(obtener_top_comentarios(resultados, tipo='negativos', cantidad=3))
+    print(obtener_top_comentarios(indice, tipo='negativos', cantidad=3))
     print("\nTOP positivos:")
-    print(obtener_top_comentarios(resultados, tipo='positivos', cantidad=3))
+    print(obtener_top_comentarios(indice, tipo='positivos', cantidad=3))
 
@@ -1,12 +1,18 @@
 from flask import Flask, render_template, request, redirect, url_for
 import os
 import csv
-from analizador import procesar_comentarios_completos, generar_reporte
+import uuid
+from collections import OrderedDict
+from analizador import procesar_comentarios_completos, generar_reporte, IndiceResultados
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
+# Análisis recientes en memoria: id -> (índice, reporte). Se descartan los más antiguos
+ANALISIS_MAX = 20
+analisis_recientes = OrderedDict()
+
 # Crear carpeta uploads si no existe
 if not os.path.exists('uploads'):
     os.makedirs('uploads')
@@ -74,7 +80,38 @@ def analizar():
     resultados = procesar_comentarios_completos(comentarios)
     reporte = generar_reporte(resultados)
     
-    return render_template('resultados.html', resultados=resultados, reporte=reporte)
+    # Construir el índice una sola vez por análisis
+    analisis_id = uuid.uuid4().hex
+    analisis_recientes[analisis_id] = (IndiceResultados(resultados), reporte)
+    while len(analisis_recientes) > ANALISIS_MAX:
+        analisis_recientes.popitem(last=False)
+    
+    return redirect(url_for('resultados', analisis_id=analisis_id))
+
+@app.route('/resultados/<analisis_id>')
+def resultados(analisis_id):
+    """Muestra resultados filtrados: ?sentimiento=&aspecto=&sarcasmo=&confianza_min=&pagina="""
+    # Una sola lectura: otro hilo puede descartar el análisis entre comprobar y leer
+    analisis = analisis_recientes.get(analisis_id)
+    if analisis is None:
+        return redirect(url_for('index'))
+    indice, reporte = analisis
+    
+    # Solo los filtros con valor, para reenviarlos en los enlaces de paginación
+    filtros = {k: request.args[k] for k in ('sentimiento', 'aspecto', 'sarcasmo', 'confianza_min', 'por_pagina')
+               if request.args.get(k)}
+    consulta = indice.consultar(
+        sentimiento=filtros.get('sentimiento'),
+        aspecto=filtros.get('aspecto'),
+        sarcasmo={'si': True, 'no': False}.get(filtros.get('sarcasmo')),
+        confianza_min=request.args.get('confianza_min', type=float),
+        pagina=request.args.get('pagina', 1, type=int),
+        por_pagina=min(request.args.get('por_pagina', 50, type=int), IndiceResultados.MAX_POR_PAGINA)
+    )
+    
+    return render_template('resultados.html', resultados=consulta['resultados'], reporte=reporte,
+                           consulta=consulta, filtros=filtros, aspectos=sorted(indice.aspectos),
+                           analisis_id=analisis_id)
 
 # CONFIGURACIÓN CORREGIDA PARA RENDER
 if __name__ == '__main__':
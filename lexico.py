@@ -0,0 +1,316 @@
+# lexico.py
+# Carga de léxicos desde archivos de datos (lexicos/*.json) y compilación a un artefacto binario.
+# El artefacto (<pack>.lexico.bin) se regenera solo cuando cambian los archivos fuente.
+# Se guarda con marshal y solo contiene datos (dict, list, tuple, frozenset, str, float):
+# cargarlo no ejecuta código, a diferencia de pickle.
+# Compilar por adelantado: python lexico.py [pack]
+import os
+import json
+import marshal
+import logging
+from collections import deque
+from typing import Callable, Dict, Any, List, Tuple
+
+# ---------- CONFIGURACIÓN ----------
+DIRECTORIO_LEXICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicos')
+PACK_POR_DEFECTO = os.environ.get('LEXICO_PACK', 'base')
+# Subir si cambia la estructura del artefacto o la forma de plegar las claves
+VERSION_ARTEFACTO = 2
+
+# Secciones de tipo lista (se unen con las del pack padre)
+SECCIONES_LISTA = (
+    'positivas', 'positivas_fuertes', 'negativas', 'negativas_fuertes',
+    'negaciones', 'intensificadores', 'atenuadores', 'neutras',
+    'frases_positivas', 'frases_negativas', 'bigrams_positivos', 'bigrams_negativos'
+)
+
+# Léxicos ya cargados en este proceso: ruta -> (firma, léxico)
+_cache: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+
+# ---------- AUTÓMATA DE FRASES ----------
+class AutomataFrases:
+    """
+    Autómata Aho-Corasick: encuentra en una sola pasada todas las frases
+    presentes en el texto (incluidas las solapadas, p. ej. 'vale la pena'
+    dentro de 'no vale la pena').
+    """
+
+    def __init__(self, patrones: List[str], pesos: List[float] = None):
+        self.patrones = list(patrones)
+        self.pesos = list(pesos) if pesos is not None else [1.0] * len(self.patrones)
+        self.transiciones: List[Dict[str, int]] = [{}]
+        self.fallo: List[int] = [0]
+        self.salida: List[List[int]] = [[]]
+
+        for idx, patron in enumerate(self.patrones):
+            estado = 0
+            for c in patron:
+                siguiente = self.transiciones[estado].get(c)
+                if siguiente is None:
+                    siguiente = len(self.transiciones)
+                    self.transiciones[estado][c] = siguiente
+                    self.transiciones.append({})
+                    self.fallo.append(0)
+                    self.salida.append([])
+                estado = siguiente
+            self.salida[estado].append(idx)
+
+        # Enlaces de fallo por anchura
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self.transiciones[estado].items():
+                cola.append(siguiente)
+                f = self.fallo[estado]
+                while f and c not in self.transiciones[f]:
+                    f = self.fallo[f]
+                destino = self.transiciones[f].get(c, 0)
+                self.fallo[siguiente] = destino if destino != siguiente else 0
+                self.salida[siguiente] = self.salida[siguiente] + self.salida[self.fallo[siguiente]]
+
+    def a_datos(self) -> Dict[str, Any]:
+        """Estructuras planas para serializar el autómata con marshal."""
+        return {
+            'patrones': self.patrones,
+            'pesos': self.pesos,
+            'transiciones': self.transiciones,
+            'fallo': self.fallo,
+            'salida': self.salida,
+        }
+
+    @classmethod
+    def desde_datos(cls, datos: Dict[str, Any]) -> 'AutomataFrases':
+        """Reconstruye el autómata ya compilado sin volver a calcular los enlaces."""
+        automata = cls.__new__(cls)
+        automata.patrones = datos['patrones']
+        automata.pesos = datos['pesos']
+        automata.transiciones = datos['transiciones']
+        automata.fallo = datos['fallo']
+        automata.salida = datos['salida']
+        return automata
+
+    def buscar(self, texto: str) -> List[int]:
+        """Índices (ordenados) de los patrones que aparecen en el texto."""
+        transiciones, fallo, salida = self.transiciones, self.fallo, self.salida
+        encontrados = set()
+        estado = 0
+        for c in texto:
+            while estado and c not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(c, 0)
+            if salida[estado]:
+                encontrados.update(salida[estado])
+        return sorted(encontrados)
+
+# ---------- LECTURA DE PACKS ----------
+def ruta_pack(pack: str) -> str:
+    """Un pack es un nombre dentro de lexicos/ ('base', 'restaurantes') o la ruta a un .json."""
+    if pack.endswith('.json') or os.sep in pack:
+        return os.path.abspath(pack)
+    return os.path.join(DIRECTORIO_LEXICOS, pack + '.json')
+
+def resolver_padre(padre: str, ruta_hijo: str) -> str:
+    """
+    Resuelve "extiende": ruta absoluta, o relativa al directorio del pack que lo declara
+    ('comun', 'comun.json', 'sub/comun.json'); si ahí no existe, se busca en lexicos/.
+    """
+    if os.path.isabs(padre):
+        return padre
+    nombre = padre if padre.endswith('.json') else padre + '.json'
+    junto_al_hijo = os.path.normpath(os.path.join(os.path.dirname(ruta_hijo), nombre))
+    if os.path.exists(junto_al_hijo):
+        return junto_al_hijo
+    return os.path.join(DIRECTORIO_LEXICOS, nombre)
+
+def leer_fuentes(ruta: str, plegar: Callable[[str], str] = None,
+                 visitados: Tuple[str, ...] = ()) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Lee un pack y, si declara "extiende", su cadena de padres.
+    Devuelve los datos combinados y la lista de archivos fuente leídos.
+    Las entradas de "quitar" se comparan ya plegadas con `plegar`.
+    """
+    if ruta in visitados:
+        raise ValueError(f"Herencia circular de léxicos: {ruta}")
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+
+    padre = datos.get('extiende')
+    if padre:
+        base, fuentes = leer_fuentes(resolver_padre(padre, ruta), plegar, visitados + (ruta,))
+    else:
+        base, fuentes = {}, []
+
+    combinado = {k: v for k, v in base.items() if k not in ('extiende', 'quitar')}
+    for seccion in SECCIONES_LISTA:
+        combinado[seccion] = list(base.get(seccion, [])) + list(datos.get(seccion, []))
+    combinado['pesos'] = {**base.get('pesos', {}), **datos.get('pesos', {})}
+    aspectos = {k: list(v) for k, v in base.get('aspectos', {}).items()}
+    for aspecto, claves in datos.get('aspectos', {}).items():
+        aspectos.setdefault(aspecto, []).extend(claves)
+    combinado['aspectos'] = aspectos
+    combinado['descripcion'] = datos.get('descripcion', base.get('descripcion', ''))
+    aplicar_quitar(combinado, datos.get('quitar', {}), plegar, ruta)
+    return combinado, fuentes + [ruta]
+
+def aplicar_quitar(combinado: Dict[str, Any], quitar: Dict[str, Any],
+                   plegar: Callable[[str], str], ruta: str) -> None:
+    """Elimina las entradas de "quitar" (con o sin pack padre); 'útil' quita también 'util'."""
+    plegar = plegar or (lambda e: e)
+    for seccion, entradas in quitar.items():
+        if seccion == 'aspectos':
+            if not isinstance(entradas, dict):
+                raise ValueError(f"{ruta}: \"quitar\".aspectos debe ser un objeto aspecto -> claves")
+            for aspecto, claves in entradas.items():
+                fuera = {plegar(k) for k in claves}
+                combinado['aspectos'][aspecto] = [k for k in combinado['aspectos'].get(aspecto, []) if plegar(k) not in fuera]
+        elif seccion in SECCIONES_LISTA:
+            fuera = {plegar(e) for e in entradas}
+            combinado[seccion] = [e for e in combinado[seccion] if plegar(e) not in fuera]
+        else:
+            raise ValueError(f"{ruta}: \"quitar\" no admite la sección '{seccion}' "
+                             f"(solo {', '.join(SECCIONES_LISTA)} o aspectos)")
+
+def firma_fuentes(fuentes: List[str]) -> Tuple:
+    # mtime + tamaño: basta con un stat por archivo para saber si hay que recompilar.
+    # El formato de marshal depende de la versión de Python: también forma parte de la firma
+    firma = []
+    for ruta in fuentes:
+        st = os.stat(ruta)
+        firma.append((ruta, st.st_mtime_ns, st.st_size))
+    return ((VERSION_ARTEFACTO, marshal.version), tuple(firma))
+
+# ---------- COMPILACIÓN ----------
+def compilar_lexico(datos: Dict[str, Any], plegar: Callable[[str], str]) -> Dict[str, Any]:
+    """
+    Convierte los datos fuente en el léxico listo para el analizador:
+    claves plegadas con `plegar` (la misma normalización que limpiar_texto),
+    pesos por palabra, autómatas de frases/bigrams e índice de aspectos.
+    """
+    def conjunto(seccion: str) -> frozenset:
+        return frozenset(filter(None, (plegar(e) for e in datos.get(seccion, []))))
+
+    pesos = datos['pesos']
+    positivas, positivas_fuertes = conjunto('positivas'), conjunto('positivas_fuertes')
+    negativas, negativas_fuertes = conjunto('negativas'), conjunto('negativas_fuertes')
+
+    # palabra -> peso base; si aparece en ambas listas prevalece la positiva
+    pesos_palabras = {}
+    for palabra in negativas:
+        pesos_palabras[palabra] = pesos['negativa_fuerte'] if palabra in negativas_fuertes else pesos['negativa']
+    for palabra in positivas:
+        pesos_palabras[palabra] = pesos['palabra_fuerte'] if palabra in positivas_fuertes else pesos['palabra']
+
+    def automata(positivas: str, negativas: str, peso: float) -> AutomataFrases:
+        frases_pos = sorted(conjunto(positivas))
+        frases_neg = sorted(conjunto(negativas))
+        return AutomataFrases(frases_pos + frases_neg, [peso] * len(frases_pos) + [-peso] * len(frases_neg))
+
+    # clave plegada -> aspectos; las claves de varias palabras se buscan aparte
+    indice_aspectos: Dict[str, List[str]] = {}
+    aspectos_compuestos: List[Tuple[str, str]] = []
+    for aspecto, claves in datos.get('aspectos', {}).items():
+        for clave in dict.fromkeys(plegar(k) for k in claves):
+            if not clave:
+                continue
+            if ' ' in clave:
+                aspectos_compuestos.append((clave, aspecto))
+            else:
+                indice_aspectos.setdefault(clave, []).append(aspecto)
+
+    return {
+        'descripcion': datos.get('descripcion', ''),
+        'pesos': dict(pesos),
+        'positivas': positivas,
+        'positivas_fuertes': positivas_fuertes,
+        'negativas': negativas,
+        'negativas_fuertes': negativas_fuertes,
+        'pesos_palabras': pesos_palabras,
+        'negaciones': conjunto('negaciones'),
+        'intensificadores': conjunto('intensificadores'),
+        'atenuadores': conjunto('atenuadores'),
+        'neutras': conjunto('neutras'),
+        'automata_frases': automata('frases_positivas', 'frases_negativas', pesos['frase']),
+        'automata_bigrams': automata('bigrams_positivos', 'bigrams_negativos', pesos['bigram']),
+        'aspectos': list(datos.get('aspectos', {})),
+        'indice_aspectos': indice_aspectos,
+        'aspectos_compuestos': aspectos_compuestos,
+    }
+
+AUTOMATAS = ('automata_frases', 'automata_bigrams')
+
+def ruta_artefacto(ruta: str) -> str:
+    return os.path.splitext(ruta)[0] + '.lexico.bin'
+
+def _leer_artefacto(ruta: str):
+    try:
+        with open(ruta_artefacto(ruta), 'rb') as f:
+            firma, lexico = marshal.loads(f.read())
+        # la firma guarda la cadena de fuentes; si alguna cambió (o ya no existe) hay que recompilar
+        if firma != firma_fuentes([r for r, _, _ in firma[1]]):
+            return None
+        for nombre in AUTOMATAS:
+            lexico[nombre] = AutomataFrases.desde_datos(lexico[nombre])
+        return firma, lexico
+    except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError):
+        return None
+
+def construir_artefacto(pack: str, plegar: Callable[[str], str]) -> Tuple[Any, Dict[str, Any]]:
+    """Compila el pack desde sus fuentes y guarda el artefacto junto al .json."""
+    ruta = ruta_pack(pack)
+    datos, fuentes = leer_fuentes(ruta, plegar)
+    firma = firma_fuentes(fuentes)
+    lexico = compilar_lexico(datos, plegar)
+
+    destino = ruta_artefacto(ruta)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    try:
+        serializable = dict(lexico)
+        for nombre in AUTOMATAS:
+            serializable[nombre] = lexico[nombre].a_datos()
+        with open(temporal, 'wb') as f:
+            marshal.dump((firma, serializable), f)
+        os.replace(temporal, destino)
+    except OSError as e:
+        # p. ej. sistema de archivos de solo lectura: se usa el léxico compilado en memoria
+        logging.warning(f"No se pudo guardar el artefacto de léxico {destino}: {e}")
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return firma, lexico
+
+def cargar_lexico(pack: str = None, plegar: Callable[[str], str] = None) -> Dict[str, Any]:
+    """
+    Devuelve el léxico compilado del pack (por defecto $LEXICO_PACK o 'base').
+    Orden: caché del proceso -> artefacto en disco -> compilar desde las fuentes.
+    El léxico devuelto es compartido: no modificarlo.
+    """
+    ruta = ruta_pack(pack or PACK_POR_DEFECTO)
+
+    en_cache = _cache.get(ruta)
+    if en_cache is not None:
+        firma, lexico = en_cache
+        try:
+            if firma == firma_fuentes([r for r, _, _ in firma[1]]):
+                return lexico
+        except OSError:
+            pass
+
+    cargado = _leer_artefacto(ruta)
+    if cargado is None:
+        if plegar is None:
+            raise ValueError("Se necesita la función de plegado para compilar el léxico")
+        cargado = construir_artefacto(ruta, plegar)
+    _cache[ruta] = cargado
+    return cargado[1]
+
+if __name__ == "__main__":
+    import sys
+    # Importar desde el módulo (no desde __main__) para usar las mismas definiciones que la app
+    from lexico import construir_artefacto, ruta_artefacto, ruta_pack, PACK_POR_DEFECTO
+    from analizador import AnalizadorSentimientos
+
+    packs = sys.argv[1:] or [PACK_POR_DEFECTO]
+    for pack in packs:
+        firma, lexico = construir_artefacto(pack, AnalizadorSentimientos.limpiar_texto)
+        print(f"✅ {pack}: {len(lexico['pesos_palabras'])} palabras, "
+              f"{len(lexico['automata_frases'].patrones)} frases, "
+              f"{len(lexico['automata_bigrams'].patrones)} bigrams -> {ruta_artefacto(ruta_pack(pack))}")
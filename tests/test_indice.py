@@ -0,0 +1,133 @@
+import random
+import sys
+
+import pytest
+
+from analizador import IndiceResultados, obtener_top_comentarios
+
+ASPECTOS = ['calidad', 'precio', 'servicio', 'funcionalidad']
+CLAVES_ORDEN = {
+    'Positivo': lambda r: -r['score'],
+    'Negativo': lambda r: r['score'],
+    'Neutro': lambda r: abs(r['score']),
+}
+
+
+def generar_resultados(n, semilla=7):
+    azar = random.Random(semilla)
+    resultados = []
+    for i in range(1, n + 1):
+        sentimiento = azar.choice(['Positivo', 'Negativo', 'Neutro'])
+        score = round(azar.uniform(0.4, 5), 2)
+        if sentimiento == 'Negativo':
+            score = -score
+        elif sentimiento == 'Neutro':
+            score = round(azar.uniform(-0.4, 0.4), 2)
+        resultados.append({
+            'id': i,
+            'comentario': f'comentario {i}',
+            'sentimiento': sentimiento,
+            'score': score,
+            'confianza': float(azar.choice([15, 35, 50, 60, 75, 100])),
+            'aspectos': {a: 1 for a in azar.sample(ASPECTOS, azar.randint(0, 2))},
+            'sarcasmo': azar.random() < 0.2,
+        })
+    return resultados
+
+
+def consulta_bruta(resultados, sentimiento=None, aspecto=None, sarcasmo=None,
+                   confianza_min=None, pagina=1, por_pagina=20):
+    filtrados = [
+        r for r in resultados
+        if (sentimiento is None or r['sentimiento'] == sentimiento)
+        and (aspecto is None or aspecto in r['aspectos'])
+        and (sarcasmo is None or r['sarcasmo'] == sarcasmo)
+        and (confianza_min is None or r['confianza'] >= confianza_min)
+    ]
+    if sentimiento:
+        filtrados.sort(key=CLAVES_ORDEN[sentimiento])
+    inicio = (pagina - 1) * por_pagina
+    return filtrados[inicio:inicio + por_pagina], len(filtrados) > pagina * por_pagina
+
+
+@pytest.fixture(scope='module')
+def resultados():
+    return generar_resultados(500)
+
+
+@pytest.fixture(scope='module')
+def indice(resultados):
+    return IndiceResultados(resultados)
+
+
+@pytest.mark.parametrize('sentimiento', [None, 'Positivo', 'Negativo', 'Neutro'])
+@pytest.mark.parametrize('aspecto', [None, 'precio', 'servicio'])
+@pytest.mark.parametrize('sarcasmo', [None, True, False])
+@pytest.mark.parametrize('confianza_min', [None, 60, 100])
+@pytest.mark.parametrize('pagina,por_pagina', [(1, 20), (3, 7), (50, 20)])
+def test_consultar_coincide_con_fuerza_bruta(resultados, indice, sentimiento, aspecto,
+                                             sarcasmo, confianza_min, pagina, por_pagina):
+    esperado, hay_mas = consulta_bruta(resultados, sentimiento, aspecto, sarcasmo,
+                                       confianza_min, pagina, por_pagina)
+    consulta = indice.consultar(sentimiento, aspecto, sarcasmo, confianza_min, pagina, por_pagina)
+    assert [r['id'] for r in consulta['resultados']] == [r['id'] for r in esperado]
+    assert consulta['hay_mas'] == hay_mas
+
+
+def test_filtros_vacios_o_con_espacios_se_ignoran(indice):
+    todos = indice.consultar(por_pagina=10)['resultados']
+    assert indice.consultar(sentimiento=' ', aspecto=' ', por_pagina=10)['resultados'] == todos
+    assert (indice.consultar(sentimiento=' negativo ', aspecto=' PRECIO ')['resultados']
+            == indice.consultar(sentimiento='Negativo', aspecto='precio')['resultados'])
+
+
+def test_filtro_desconocido_no_devuelve_nada(indice):
+    assert indice.consultar(aspecto='envio')['resultados'] == []
+    assert indice.consultar(sentimiento='Mixto')['resultados'] == []
+
+
+@pytest.mark.parametrize('tipo', ['positivos', 'negativos'])
+def test_top_comentarios_lista_e_indice(resultados, indice, tipo):
+    sentimiento = 'Positivo' if tipo == 'positivos' else 'Negativo'
+    esperado, _ = consulta_bruta(resultados, sentimiento, por_pagina=5)
+    assert obtener_top_comentarios(resultados, tipo, 5) == esperado
+    assert obtener_top_comentarios(indice, tipo, 5) == esperado
+    assert obtener_top_comentarios(resultados, 'otros', 5) == []
+
+
+def test_paginas_y_tamanos_enormes_no_fallan(resultados, indice):
+    consulta = indice.consultar(pagina=sys.maxsize, por_pagina=2)
+    assert consulta['resultados'] == [] and not consulta['hay_mas']
+    consulta = indice.consultar(sentimiento='Negativo', aspecto='precio', confianza_min=60,
+                                pagina=10 ** 11, por_pagina=10 ** 11)
+    assert consulta['resultados'] == [] and not consulta['hay_mas']
+
+
+def test_por_pagina_se_limita(resultados, indice):
+    consulta = indice.consultar(por_pagina=10 ** 6)
+    assert consulta['por_pagina'] == IndiceResultados.MAX_POR_PAGINA
+    assert [r['id'] for r in consulta['resultados']] == [r['id'] for r in resultados[:IndiceResultados.MAX_POR_PAGINA]]
+    assert consulta['hay_mas']
+
+
+def test_ultima_pagina_con_resultados_no_se_recorta(resultados, indice):
+    ultima = (len(resultados) - 1) // 7 + 1
+    esperado, _ = consulta_bruta(resultados, pagina=ultima, por_pagina=7)
+    assert indice.consultar(pagina=ultima, por_pagina=7)['resultados'] == esperado != []
+
+
+def test_top_comentarios_con_indice_sin_limite_de_pagina():
+    resultados = generar_resultados(1500)
+    esperado, _ = consulta_bruta(resultados, 'Negativo', por_pagina=300)
+    assert len(esperado) > IndiceResultados.MAX_POR_PAGINA
+    assert obtener_top_comentarios(IndiceResultados(resultados), 'negativos', 300) == esperado
+
+
+def test_ruta_resultados_con_paginacion_enorme():
+    flask = pytest.importorskip('flask')  # noqa: F841
+    import app as aplicacion
+
+    cliente = aplicacion.app.test_client()
+    respuesta = cliente.post('/analizar', data={'tipo': 'texto', 'comentarios': 'Excelente\nHorrible'})
+    respuesta = cliente.get(respuesta.location + '?pagina=100000000000&por_pagina=100000000000')
+    assert respuesta.status_code == 200
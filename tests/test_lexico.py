@@ -0,0 +1,198 @@
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import lexico
+from analizador import AnalizadorSentimientos
+from lexico import AutomataFrases, cargar_lexico, leer_fuentes, ruta_artefacto, ruta_pack
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+plegar = AnalizadorSentimientos.limpiar_texto
+
+PESOS = {"frase": 2.5, "bigram": 1.5, "palabra_fuerte": 2.0, "palabra": 1.0,
+         "negativa_fuerte": -2.2, "negativa": -1.0}
+
+
+@pytest.fixture
+def pack(tmp_path):
+    ruta = tmp_path / 'prueba.json'
+    ruta.write_text(json.dumps({
+        "pesos": PESOS,
+        "positivas": ["genial", "útil"],
+        "negativas": ["malo"],
+        "frases_positivas": ["vale la pena"],
+        "frases_negativas": ["no vale la pena"],
+        "aspectos": {"precio": ["precio", "caro"]},
+    }, ensure_ascii=False), encoding='utf-8')
+    lexico._cache.clear()
+    yield str(ruta)
+    lexico._cache.clear()
+
+
+def contar_compilaciones(monkeypatch):
+    llamadas = []
+    original = lexico.construir_artefacto
+
+    def espia(*args):
+        llamadas.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(lexico, 'construir_artefacto', espia)
+    return llamadas
+
+
+# ---------- Autómata ----------
+def test_automata_coincide_con_subcadenas():
+    azar = random.Random(3)
+    for _ in range(500):
+        patrones = [''.join(azar.choice('ab ') for _ in range(azar.randint(1, 4))) for _ in range(6)]
+        texto = ''.join(azar.choice('ab ') for _ in range(azar.randint(0, 30)))
+        automata = AutomataFrases(patrones)
+        assert automata.buscar(texto) == [i for i, p in enumerate(patrones) if p in texto]
+
+
+def test_automata_frases_del_lexico_base():
+    datos, _ = leer_fuentes(ruta_pack('base'), plegar)
+    frases = sorted({plegar(f) for f in datos['frases_positivas'] + datos['frases_negativas']})
+    automata = AutomataFrases(frases)
+    for comentario in ['no vale la pena, no lo recomiendo', 'Superó expectativas: vale la pena',
+                       'muy mala calidad y pésima calidad', '']:
+        texto = plegar(comentario)
+        assert automata.buscar(texto) == [i for i, f in enumerate(frases) if f in texto]
+
+
+def test_automata_serializado_equivale_al_original():
+    automata = AutomataFrases(['vale la pena', 'no vale la pena', 'la'], [2.5, -2.5, 1.0])
+    copia = AutomataFrases.desde_datos(automata.a_datos())
+    assert copia.buscar('no vale la pena') == automata.buscar('no vale la pena') == [0, 1, 2]
+    assert copia.pesos == automata.pesos
+
+
+# ---------- Artefacto ----------
+def test_artefacto_se_reutiliza_si_no_cambian_las_fuentes(pack, monkeypatch):
+    cargar_lexico(pack, plegar)
+    assert os.path.exists(ruta_artefacto(pack))
+    llamadas = contar_compilaciones(monkeypatch)
+    lexico._cache.clear()
+    assert 'genial' in cargar_lexico(pack, plegar)['positivas']
+    assert llamadas == []
+
+
+def test_artefacto_se_recompila_si_cambia_el_mtime(pack, monkeypatch):
+    cargar_lexico(pack, plegar)
+    llamadas = contar_compilaciones(monkeypatch)
+    st = os.stat(pack)
+    os.utime(pack, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    cargar_lexico(pack, plegar)
+    assert len(llamadas) == 1
+
+
+def test_cambios_en_las_fuentes_llegan_al_proceso(pack):
+    assert 'sabroso' not in cargar_lexico(pack, plegar)['positivas']
+    datos = json.loads(open(pack, encoding='utf-8').read())
+    datos['positivas'].append('sabroso')
+    with open(pack, 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    assert 'sabroso' in cargar_lexico(pack, plegar)['positivas']
+
+
+def test_artefacto_generado_por_la_cli_se_carga_sin_recompilar(pack, monkeypatch):
+    subprocess.run([sys.executable, 'lexico.py', pack], cwd=RAIZ, check=True, capture_output=True)
+    with open(ruta_artefacto(pack), 'rb') as f:
+        assert b'__main__' not in f.read()
+
+    def prohibido(*args):
+        raise AssertionError("no debería recompilar")
+
+    monkeypatch.setattr(lexico, 'construir_artefacto', prohibido)
+    compilado = cargar_lexico(pack)
+    assert compilado['pesos_palabras']['util'] == PESOS['palabra']
+    assert compilado['automata_frases'].buscar('no vale la pena') == [0, 1]
+
+
+def test_artefacto_corrupto_se_recompila(pack, monkeypatch):
+    cargar_lexico(pack, plegar)
+    with open(ruta_artefacto(pack), 'wb') as f:
+        f.write(b'basura')
+    lexico._cache.clear()
+    llamadas = contar_compilaciones(monkeypatch)
+    assert 'malo' in cargar_lexico(pack, plegar)['negativas']
+    assert len(llamadas) == 1
+
+
+# ---------- Packs ----------
+def test_quitar_compara_claves_plegadas(pack, tmp_path):
+    hijo = tmp_path / 'hijo.json'
+    hijo.write_text(json.dumps({
+        "extiende": pack,
+        "positivas": ["sabroso"],
+        "quitar": {"positivas": ["util"], "aspectos": {"precio": ["CARO"]}},
+    }), encoding='utf-8')
+    compilado = cargar_lexico(str(hijo), plegar)
+    assert compilado['positivas'] == {'genial', 'sabroso'}
+    assert compilado['indice_aspectos'] == {'precio': ['precio']}
+
+
+def test_orden_de_aspectos_no_depende_del_hash():
+    codigo = ("from analizador import AnalizadorSentimientos as A; "
+              "print(list(A().analizar_sentimiento("
+              "'el precio, la calidad y el servicio: funciona')['aspectos']))")
+    salidas = set()
+    for semilla in range(1, 5):
+        entorno = dict(os.environ, PYTHONHASHSEED=str(semilla))
+        salida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=entorno,
+                                check=True, capture_output=True, text=True).stdout
+        salidas.add(salida.strip())
+    assert salidas == {"['calidad', 'precio', 'servicio', 'funcionalidad']"}
+
+
+def test_extiende_relativo_al_directorio_del_pack(tmp_path, monkeypatch):
+    packs = tmp_path / 'packs'
+    packs.mkdir()
+    (packs / 'comun.json').write_text(json.dumps({"pesos": PESOS, "positivas": ["genial"]}), encoding='utf-8')
+    (packs / 'hijo.json').write_text(json.dumps({"extiende": "comun.json", "positivas": ["sabroso"]}),
+                                     encoding='utf-8')
+    (packs / 'nieto.json').write_text(json.dumps({"extiende": "hijo", "negativas": ["malo"]}), encoding='utf-8')
+    otro = tmp_path / 'otro'
+    otro.mkdir()
+    monkeypatch.chdir(otro)
+
+    datos, fuentes = leer_fuentes(str(packs / 'nieto.json'), plegar)
+    assert fuentes == [str(packs / 'comun.json'), str(packs / 'hijo.json'), str(packs / 'nieto.json')]
+    assert datos['positivas'] == ['genial', 'sabroso'] and datos['negativas'] == ['malo']
+
+
+def test_extiende_por_nombre_usa_lexicos_si_no_esta_junto_al_pack(tmp_path, monkeypatch):
+    hijo = tmp_path / 'hijo.json'
+    hijo.write_text(json.dumps({"extiende": "base", "positivas": ["sabroso"]}), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    _, fuentes = leer_fuentes(str(hijo), plegar)
+    assert fuentes == [ruta_pack('base'), str(hijo)]
+
+
+def test_quitar_sin_pack_padre(tmp_path):
+    ruta = tmp_path / 'solo.json'
+    ruta.write_text(json.dumps({
+        "pesos": PESOS,
+        "positivas": ["genial", "útil"],
+        "aspectos": {"precio": ["precio", "caro"]},
+        "quitar": {"positivas": ["util"], "aspectos": {"precio": ["caro"]}},
+    }, ensure_ascii=False), encoding='utf-8')
+    datos, _ = leer_fuentes(str(ruta), plegar)
+    assert datos['positivas'] == ['genial']
+    assert datos['aspectos'] == {'precio': ['precio']}
+
+
+@pytest.mark.parametrize('quitar', [{"pesos": ["frase"]}, {"descripcion": ["x"]}, {"aspectos": ["precio"]}])
+@pytest.mark.parametrize('con_padre', [False, True])
+def test_quitar_rechaza_secciones_no_lista(pack, tmp_path, quitar, con_padre):
+    ruta = tmp_path / 'malo.json'
+    datos = {"quitar": quitar}
+    datos.update({"extiende": pack} if con_padre else {"pesos": PESOS})
+    ruta.write_text(json.dumps(datos), encoding='utf-8')
+    with pytest.raises(ValueError, match='quitar'):
+        leer_fuentes(str(ruta), plegar)